@@ -148,10 +148,8 @@ def handler(request):
       client.query(merge_sql).result()
       print("MERGE completed successfully.")
 
-      # CLEAR STAGING TABLE AFTER MERGE
-      truncate_sql = f"TRUNCATE TABLE `{bq_project_id}.{staging_dataset_id}.{staging_table_id}`"
-      client.query(truncate_sql).result()
-      print(f"Staging table {staging_table_id} truncated successfully.")
+      # No truncate needed here: the staging load above uses WRITE_TRUNCATE,
+      # so the next run clears the table as part of a load it does anyway
 
   else:
       print("Can't Merge because no new or updated rows to load.")
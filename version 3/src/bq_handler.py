@@ -1,86 +1,252 @@
 """
 BigQuery operations handler module.
 """
+import io
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from google.cloud import bigquery
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional, Union
 
 
 class BigQueryHandler:
     """Handles BigQuery operations including loading and merging data."""
-    
+
+    # Safety-net expiry for staging tables; the normal path drops them
+    # right after the merge
+    STAGING_TTL_HOURS = 6
+
+    # Above this the Storage Write API's per-append overhead stops paying
+    # off and a bulk load job wins; batches are appended in chunks below it
+    STORAGE_WRITE_MAX_ROWS = 1000000
+    STORAGE_WRITE_BATCH_ROWS = 5000
+
+    # Below this, creating a staging table, running a load job, merging,
+    # and dropping the table costs more than sending the rows inline with
+    # the MERGE itself
+    INLINE_MERGE_MAX_ROWS = 5000
+
+    # Legacy BigQuery type names that query parameters spell differently
+    _PARAM_TYPE_MAP = {
+        'INTEGER': 'INT64',
+        'FLOAT': 'FLOAT64',
+        'BOOLEAN': 'BOOL',
+    }
+
     def __init__(self, client: bigquery.Client):
         self.client = client
-    
-    def ensure_staging_table(
+        # Target table metadata fetched this run, keyed by full table ref.
+        # Each get_table is a REST round-trip and the schema only changes
+        # when we change it ourselves.
+        self._table_cache: Dict[str, bigquery.Table] = {}
+        # Rendered MERGE statements keyed by target ref, merge columns, and
+        # schema signature; the staging ref is left as a placeholder since
+        # it changes every run
+        self._merge_sql_cache: Dict[tuple, str] = {}
+
+    def get_table_cached(self, table_ref: str) -> bigquery.Table:
+        """
+        Fetch table metadata, reusing the result within this run.
+
+        Args:
+            table_ref: Full BigQuery table reference
+
+        Returns:
+            bigquery.Table object
+        """
+        if table_ref not in self._table_cache:
+            self._table_cache[table_ref] = self.client.get_table(table_ref)
+        return self._table_cache[table_ref]
+
+    def invalidate_table_cache(self, table_ref: str) -> None:
+        """Drop a cached table entry after its schema has been modified."""
+        self._table_cache.pop(table_ref, None)
+
+    def create_staging_table(
         self,
         target_table_ref: str,
-        staging_table_ref: str
-    ) -> Tuple[Optional[list], Optional[str]]:
+        staging_dataset_id: str
+    ) -> Tuple[Optional[str], Optional[list], Optional[str]]:
         """
-        Ensure staging table exists with same schema as target table.
-        
+        Create a uniquely-named per-run staging table with the target's schema.
+
+        A fresh table per run avoids truncate jobs, stays clear of the
+        per-table daily modification quota, and lets concurrent syncs of
+        the same target coexist. The table carries a TTL in case the drop
+        after merge never happens.
+
         Args:
             target_table_ref: Full reference to target table
-            staging_table_ref: Full reference to staging table
-            
+            staging_dataset_id: Dataset to create the staging table in
+
         Returns:
-            Tuple of (schema, error_message)
+            Tuple of (staging_table_ref, schema, error_message)
         """
         try:
-            target_table = self.client.get_table(target_table_ref)
-            
-            try:
-                self.client.get_table(staging_table_ref)
-            except Exception:
-                staging_table = bigquery.Table(
-                    staging_table_ref, 
-                    schema=target_table.schema
-                )
-                self.client.create_table(staging_table)
-            
-            return target_table.schema, None
-            
+            target_table = self.get_table_cached(target_table_ref)
+
+            project_id = target_table_ref.split('.')[0]
+            target_table_id = target_table_ref.split('.')[-1]
+            staging_table_id = f"{target_table_id}__stg_{uuid4().hex[:10]}"
+            staging_table_ref = f"{project_id}.{staging_dataset_id}.{staging_table_id}"
+
+            staging_table = bigquery.Table(
+                staging_table_ref,
+                schema=target_table.schema
+            )
+            staging_table.expires = (
+                datetime.now(timezone.utc) + timedelta(hours=self.STAGING_TTL_HOURS)
+            )
+            self.client.create_table(staging_table)
+
+            return staging_table_ref, target_table.schema, None
+
         except Exception as e:
-            return None, f"Failed to ensure staging table: {str(e)}"
-    
+            return None, None, f"Failed to create staging table: {str(e)}"
+
     def load_to_staging(
         self,
         df: pd.DataFrame,
         staging_table_ref: str,
-        schema: list
+        schema: list,
+        use_storage_write: bool = False
     ) -> Tuple[int, Optional[str]]:
         """
         Load DataFrame to staging table.
-        
+
         Args:
             df: DataFrame to load
             staging_table_ref: Full reference to staging table
             schema: BigQuery schema
-            
+            use_storage_write: Try the Storage Write API first (gRPC,
+                quota-free) and fall back to a load job on failure.
+                Requires google-cloud-bigquery-storage.
+
         Returns:
             Tuple of (row_count, error_message)
         """
         try:
             if df.empty:
                 return 0, None
-            
+
+            if use_storage_write and len(df) <= self.STORAGE_WRITE_MAX_ROWS:
+                row_count, err = self._load_via_storage_write(df, staging_table_ref)
+                if err is None:
+                    return row_count, None
+                print(f"Storage Write API failed ({err}); falling back to load job")
+
+            # Serialize to Parquet ourselves rather than going through
+            # load_table_from_dataframe, which re-derives types and makes
+            # an extra copy on every call
+            arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+            buf = io.BytesIO()
+            pq.write_table(
+                arrow_table, buf, compression="snappy", use_dictionary=True
+            )
+            buf.seek(0)
+
+            # The staging table is created fresh each run, so a plain
+            # append avoids the truncate round-trip
             job_config = bigquery.LoadJobConfig(
                 schema=schema,
-                write_disposition="WRITE_TRUNCATE"
+                source_format=bigquery.SourceFormat.PARQUET,
+                write_disposition="WRITE_APPEND"
             )
-            
-            self.client.load_table_from_dataframe(
-                df, 
-                staging_table_ref, 
+
+            self.client.load_table_from_file(
+                buf,
+                staging_table_ref,
                 job_config=job_config
             ).result()
-            
+
             return len(df), None
-            
+
         except Exception as e:
             return 0, f"Failed to load to staging: {str(e)}"
-    
+
+    def _load_via_storage_write(
+        self,
+        df: pd.DataFrame,
+        staging_table_ref: str
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Load a DataFrame through the Storage Write API.
+
+        Appends Arrow record batches over gRPC on a PENDING stream and
+        commits atomically, avoiding load-job slots and the per-table
+        daily job quota that frequent incremental runs burn through.
+
+        Args:
+            df: DataFrame to load
+            staging_table_ref: Full reference to staging table
+
+        Returns:
+            Tuple of (row_count, error_message)
+        """
+        try:
+            # Optional dependency: only needed when the config opts in
+            from google.cloud import bigquery_storage_v1
+            from google.cloud.bigquery_storage_v1 import types, writer
+
+            # Arrow appends need the arrow_rows request field; older
+            # releases would otherwise fail with an opaque AttributeError
+            if not hasattr(types.AppendRowsRequest, 'arrow_rows'):
+                return 0, (
+                    "google-cloud-bigquery-storage >= 2.27.0 is required "
+                    "for Arrow appends"
+                )
+
+            project_id, dataset_id, table_id = staging_table_ref.split('.')
+
+            write_client = bigquery_storage_v1.BigQueryWriteClient()
+            parent = write_client.table_path(project_id, dataset_id, table_id)
+
+            write_stream = write_client.create_write_stream(
+                parent=parent,
+                write_stream=types.WriteStream(type_=types.WriteStream.Type.PENDING)
+            )
+
+            arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+
+            # First request carries the stream name and Arrow schema;
+            # subsequent requests carry only serialized batches
+            template = types.AppendRowsRequest()
+            template.write_stream = write_stream.name
+            template.arrow_rows.writer_schema.serialized_schema = (
+                arrow_table.schema.serialize().to_pybytes()
+            )
+
+            append_stream = writer.AppendRowsStream(write_client, template)
+            try:
+                offset = 0
+                for batch in arrow_table.to_batches(
+                    max_chunksize=self.STORAGE_WRITE_BATCH_ROWS
+                ):
+                    request = types.AppendRowsRequest()
+                    request.offset = offset
+                    request.arrow_rows.rows.serialized_record_batch = (
+                        batch.serialize().to_pybytes()
+                    )
+                    append_stream.send(request).result()
+                    offset += batch.num_rows
+            finally:
+                append_stream.close()
+
+            write_client.finalize_write_stream(name=write_stream.name)
+            write_client.batch_commit_write_streams(
+                types.BatchCommitWriteStreamsRequest(
+                    parent=parent,
+                    write_streams=[write_stream.name]
+                )
+            )
+
+            return len(df), None
+
+        except Exception as e:
+            return 0, f"Storage Write API load failed: {str(e)}"
+
     def merge_staging_to_target(
         self,
         project_id: str,
@@ -90,11 +256,13 @@ class BigQueryHandler:
         staging_table_id: str,
         primary_key: str,
         incremental_column: str,
-        df: pd.DataFrame
-    ) -> Tuple[str, Optional[str]]:
+        df: pd.DataFrame,
+        lookback_days: Optional[int] = None,
+        wait: bool = True
+    ) -> Tuple[Union[str, bigquery.QueryJob], Optional[str]]:
         """
         Merge data from staging table to target table.
-        
+
         Args:
             project_id: BigQuery project ID
             target_dataset_id: Production dataset ID
@@ -104,48 +272,222 @@ class BigQueryHandler:
             primary_key: Primary key column for merge
             incremental_column: Column to check for updates
             df: DataFrame being merged (for empty check)
-            
+            lookback_days: When set, restrict the target-side scan to
+                rows whose incremental column is within this many days
+                before the batch minimum. With a target partitioned on
+                the incremental column BigQuery prunes partitions
+                outside the window. Rows idle longer than the window get
+                re-inserted as duplicates, so size it past the oldest
+                rows that still change.
+            wait: When False, submit the MERGE and return the QueryJob
+                without blocking; the caller must pass it to
+                finalize_merge, which also drops the staging table.
+
+        Returns:
+            Tuple of (success_message_or_query_job, error_message)
+        """
+        try:
+            target_ref = f"{project_id}.{target_dataset_id}.{target_table_id}"
+            staging_ref = f"{project_id}.{staging_dataset_id}.{staging_table_id}"
+
+            if df.empty:
+                self.client.delete_table(staging_ref, not_found_ok=True)
+                return "No new or updated rows", None
+
+            # Get schema (cached; already fetched when staging was created)
+            target_schema = self.get_table_cached(target_ref).schema
+            cache_key = (
+                target_ref, primary_key, incremental_column,
+                lookback_days is not None,
+                tuple(f.name for f in target_schema)
+            )
+
+            merge_sql_tmpl = self._merge_sql_cache.get(cache_key)
+            if merge_sql_tmpl is None:
+                cols = [f.name for f in target_schema]
+
+                # Build update and insert clauses
+                cols_without_pk = [c for c in cols if c != primary_key]
+                update_clause = ", ".join([f"T.{c} = S.{c}" for c in cols_without_pk])
+                insert_cols = ", ".join(cols)
+                insert_vals = ", ".join([f"S.{c}" for c in cols])
+
+                # Constrain the target scan so partition pruning kicks in;
+                # anchored a lookback window below the batch minimum rather
+                # than a plain BETWEEN, which would re-insert any matched
+                # row whose stored value predates the batch
+                prune_clause = ""
+                if lookback_days is not None:
+                    prune_clause = (
+                        f" AND T.{incremental_column} >= "
+                        f"TIMESTAMP_SUB(@min_inc, INTERVAL @lookback_days DAY)"
+                    )
+
+                # Build merge SQL, leaving the per-run staging ref unresolved
+                merge_sql_tmpl = f"""
+                MERGE `{target_ref}` T
+                USING `{{staging_ref}}` S
+                ON T.{primary_key} = S.{primary_key}{prune_clause}
+                WHEN MATCHED AND T.{incremental_column} < S.{incremental_column} THEN
+                  UPDATE SET {update_clause}
+                WHEN NOT MATCHED THEN
+                  INSERT ({insert_cols}) VALUES ({insert_vals})
+                """
+                self._merge_sql_cache[cache_key] = merge_sql_tmpl
+
+            merge_sql = merge_sql_tmpl.format(staging_ref=staging_ref)
+
+            job_config = None
+            if lookback_days is not None:
+                min_inc = df[incremental_column].min()
+                if hasattr(min_inc, 'to_pydatetime'):
+                    min_inc = min_inc.to_pydatetime()
+                job_config = bigquery.QueryJobConfig(query_parameters=[
+                    bigquery.ScalarQueryParameter('min_inc', 'TIMESTAMP', min_inc),
+                    bigquery.ScalarQueryParameter('lookback_days', 'INT64', lookback_days)
+                ])
+
+            merge_job = self.client.query(merge_sql, job_config=job_config)
+
+            if not wait:
+                # The job keeps running server-side while the caller moves
+                # on; finalize_merge waits and drops the staging table
+                return merge_job, None
+
+            merge_job.result()
+
+            # Drop the per-run staging table; the TTL covers us if this fails
+            self.client.delete_table(staging_ref, not_found_ok=True)
+
+            return "Merge completed successfully", None
+
+        except Exception as e:
+            return "", f"Merge failed: {str(e)}"
+
+    def finalize_merge(
+        self,
+        merge_job: bigquery.QueryJob,
+        staging_table_ref: str
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Wait for a MERGE submitted with wait=False and clean up staging.
+
+        Args:
+            merge_job: QueryJob returned by merge_staging_to_target
+            staging_table_ref: Full reference to the per-run staging table
+
+        Returns:
+            Tuple of (success_message, error_message)
+        """
+        try:
+            merge_job.result()
+            self.client.delete_table(staging_table_ref, not_found_ok=True)
+            return "Merge completed successfully", None
+
+        except Exception as e:
+            # Best-effort drop; the TTL reaps the table if this fails too
+            try:
+                self.client.delete_table(staging_table_ref, not_found_ok=True)
+            except Exception:
+                pass
+            return "", f"Merge failed: {str(e)}"
+    
+    def merge_inline(
+        self,
+        project_id: str,
+        target_dataset_id: str,
+        target_table_id: str,
+        primary_key: str,
+        incremental_column: str,
+        df: pd.DataFrame,
+        lookback_days: Optional[int] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Merge a small batch straight into the target with UNNEST(@rows).
+
+        The rows travel as an ARRAY<STRUCT> query parameter, so one query
+        job replaces the staging-table create, load job, MERGE, and drop.
+        Only worth it below INLINE_MERGE_MAX_ROWS; parameter payloads are
+        capped and per-row conversion is Python-side.
+
+        Args:
+            project_id: BigQuery project ID
+            target_dataset_id: Production dataset ID
+            target_table_id: Target table ID
+            primary_key: Primary key column for merge
+            incremental_column: Column to check for updates
+            df: DataFrame holding the batch
+            lookback_days: Same pruning window as merge_staging_to_target
+
         Returns:
             Tuple of (success_message, error_message)
         """
         try:
             if df.empty:
                 return "No new or updated rows", None
-            
+
             target_ref = f"{project_id}.{target_dataset_id}.{target_table_id}"
-            staging_ref = f"{project_id}.{staging_dataset_id}.{staging_table_id}"
-            
-            # Get schema
-            target_schema = self.client.get_table(target_ref).schema
-            cols = [f.name for f in target_schema]
-            
-            # Build update and insert clauses
+            target_schema = self.get_table_cached(target_ref).schema
+            fields = [f for f in target_schema if f.name in df.columns]
+            cols = [f.name for f in fields]
+
             cols_without_pk = [c for c in cols if c != primary_key]
             update_clause = ", ".join([f"T.{c} = S.{c}" for c in cols_without_pk])
             insert_cols = ", ".join(cols)
             insert_vals = ", ".join([f"S.{c}" for c in cols])
-            
-            # Build merge SQL
+
+            prune_clause = ""
+            if lookback_days is not None:
+                prune_clause = (
+                    f" AND T.{incremental_column} >= "
+                    f"TIMESTAMP_SUB(@min_inc, INTERVAL @lookback_days DAY)"
+                )
+
             merge_sql = f"""
             MERGE `{target_ref}` T
-            USING `{staging_ref}` S
-            ON T.{primary_key} = S.{primary_key}
+            USING (SELECT * FROM UNNEST(@rows)) S
+            ON T.{primary_key} = S.{primary_key}{prune_clause}
             WHEN MATCHED AND T.{incremental_column} < S.{incremental_column} THEN
               UPDATE SET {update_clause}
             WHEN NOT MATCHED THEN
               INSERT ({insert_cols}) VALUES ({insert_vals})
             """
-            
-            self.client.query(merge_sql).result()
-            
-            # Truncate staging table
-            self.client.query(f"TRUNCATE TABLE `{staging_ref}`").result()
-            
-            return "Merge completed successfully", None
-            
+
+            # NaN/NaT become NULL parameters
+            records = df[cols].astype(object).where(pd.notnull(df[cols]), None).to_dict('records')
+
+            row_params = [
+                bigquery.StructQueryParameter(None, *[
+                    bigquery.ScalarQueryParameter(
+                        f.name,
+                        self._PARAM_TYPE_MAP.get(f.field_type, f.field_type),
+                        record[f.name]
+                    )
+                    for f in fields
+                ])
+                for record in records
+            ]
+
+            query_parameters = [
+                bigquery.ArrayQueryParameter('rows', 'STRUCT', row_params)
+            ]
+            if lookback_days is not None:
+                min_inc = df[incremental_column].min()
+                if hasattr(min_inc, 'to_pydatetime'):
+                    min_inc = min_inc.to_pydatetime()
+                query_parameters.extend([
+                    bigquery.ScalarQueryParameter('min_inc', 'TIMESTAMP', min_inc),
+                    bigquery.ScalarQueryParameter('lookback_days', 'INT64', lookback_days)
+                ])
+
+            job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+            self.client.query(merge_sql, job_config=job_config).result()
+
+            return "Inline merge completed successfully", None
+
         except Exception as e:
-            return "", f"Merge failed: {str(e)}"
-    
+            return "", f"Inline merge failed: {str(e)}"
+
     def get_table_info(self, table_ref: str) -> Tuple[Optional[dict], Optional[str]]:
         """
         Get table information including row count and column count.
@@ -1,22 +1,42 @@
 """
 Configuration loader module for MySQL to BigQuery sync pipeline.
 """
+import os
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    # PyYAML's C loader parses several times faster than the Python one
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+# Parsed configs keyed by (path, mtime): warm Cloud Function invocations
+# re-instantiate ConfigLoader but the file rarely changes, so they hit
+# a dict lookup instead of re-parsing the YAML
+_CONFIG_CACHE: Dict[Tuple[str, float], Dict[str, Any]] = {}
 
 
 class ConfigLoader:
     """Handles loading and parsing of configuration files."""
-    
+
     def __init__(self, config_path: str = 'tables.yml'):
         self.config_path = config_path
         self.config = self._load_config()
-    
+
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
+            cache_key = (self.config_path, os.stat(self.config_path).st_mtime)
+            if cache_key in _CONFIG_CACHE:
+                return _CONFIG_CACHE[cache_key]
+
             with open(self.config_path, 'r') as f:
-                return yaml.safe_load(f)
+                config = yaml.load(f, Loader=_SafeLoader)
+
+            _CONFIG_CACHE[cache_key] = config
+            return config
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         except yaml.YAMLError as e:
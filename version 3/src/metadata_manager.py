@@ -4,7 +4,7 @@ Metadata management module for tracking sync operations.
 from google.cloud import bigquery
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 class MetadataManager:
@@ -83,21 +83,65 @@ class MetadataManager:
         Returns:
             Last sync timestamp or epoch if never synced
         """
+        # MAX is a streaming aggregate — no sort, and the parameterized
+        # form lets BigQuery serve repeats from the result cache
         query = f"""
-            SELECT last_sync_time
+            SELECT MAX(last_sync_time) AS last_sync_time
             FROM `{project_id}.{dataset_id}.{metadata_table_id}`
-            WHERE table_name = '{table_name}'
+            WHERE table_name = @table_name
             AND status = 'SUCCESS'
-            ORDER BY last_sync_time DESC
-            LIMIT 1
         """
-        
+
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('table_name', 'STRING', table_name)
+        ])
+
         try:
-            result = list(self.client.query(query).result())
-            return result[0].last_sync_time if result else datetime(1970, 1, 1)
+            result = list(self.client.query(query, job_config=job_config).result())
+            # MAX over zero rows yields a single NULL row
+            if result and result[0].last_sync_time is not None:
+                return result[0].last_sync_time
+            return datetime(1970, 1, 1)
         except Exception:
             return datetime(1970, 1, 1)
-    
+
+    def load_all_last_sync_times(
+        self,
+        project_id: str,
+        dataset_id: str,
+        metadata_table_id: str
+    ) -> Dict[str, datetime]:
+        """
+        Get the last successful sync timestamp for every table in one query.
+
+        Each per-table lookup is a separate BigQuery job (~300ms); fetching
+        the whole metadata table up front turns N jobs into one.
+
+        Args:
+            project_id: BigQuery project ID
+            dataset_id: BigQuery dataset ID
+            metadata_table_id: Metadata table ID
+
+        Returns:
+            Dict of {table_name: last_sync_time}; tables that have never
+            synced successfully are absent
+        """
+        query = f"""
+            SELECT table_name, MAX(last_sync_time) AS last_sync_time
+            FROM `{project_id}.{dataset_id}.{metadata_table_id}`
+            WHERE status = 'SUCCESS'
+            GROUP BY table_name
+        """
+
+        try:
+            return {
+                row.table_name: row.last_sync_time
+                for row in self.client.query(query).result()
+                if row.last_sync_time is not None
+            }
+        except Exception:
+            return {}
+
     def update_metadata(
         self,
         project_id: str,
@@ -130,53 +174,40 @@ class MetadataManager:
             Error message if failed, None if successful
         """
         try:
-            # Escape single quotes in remark
-            remark_escaped = remark.replace("'", "\\'")
-            
+            table_ref = f"{project_id}.{dataset_id}.{metadata_table_id}"
+
             # Format run_time for BigQuery (remove timezone info for storage)
-            run_time_str = run_time.astimezone(self.TIMEZONE).replace(tzinfo=None).isoformat()
-            
-            # Build sync_time clause
+            run_time = run_time.astimezone(self.TIMEZONE).replace(tzinfo=None)
+
+            # Normalize sync_time; None keeps the existing value via COALESCE
             if sync_time and status == 'SUCCESS':
-                # Handle both datetime and Timestamp objects from pandas
-                if hasattr(sync_time, 'to_pydatetime'):
-                    # It's a pandas Timestamp
-                    sync_time = sync_time.to_pydatetime()
-                
-                # If timezone-aware, convert to Lagos time then remove tz
-                if hasattr(sync_time, 'tzinfo') and sync_time.tzinfo is not None:
-                    sync_time_str = sync_time.astimezone(self.TIMEZONE).replace(tzinfo=None).isoformat()
-                else:
-                    # Already timezone-naive, just format
-                    sync_time_str = sync_time.isoformat()
-                
-                sync_time_clause = f"TIMESTAMP('{sync_time_str}')"
+                sync_time = self._normalize_sync_time(sync_time)
             else:
-                # Keep existing sync time if this run failed
-                sync_time_clause = """
-                    COALESCE(
-                        (SELECT last_sync_time 
-                         FROM `{0}.{1}.{2}` 
-                         WHERE table_name = '{3}'),
-                        TIMESTAMP('1970-01-01 00:00:00')
-                    )
-                """.format(project_id, dataset_id, metadata_table_id, table_name)
-            
+                sync_time = None
+
+            # Values go in as query parameters: no manual quote escaping,
+            # and BigQuery can reuse the cached plan across tables
             merge_sql = f"""
-            MERGE `{project_id}.{dataset_id}.{metadata_table_id}` M
+            MERGE `{table_ref}` M
             USING (
-                SELECT 
-                    '{table_name}' AS table_name,
-                    TIMESTAMP('{run_time_str}') AS last_run_time,
-                    {sync_time_clause} AS last_sync_time,
-                    '{status}' AS status,
-                    {row_count} AS row_count,
-                    {column_count} AS column_count,
-                    '{remark_escaped}' AS remark
+                SELECT
+                    @table_name AS table_name,
+                    @run_time AS last_run_time,
+                    COALESCE(
+                        @sync_time,
+                        (SELECT last_sync_time
+                         FROM `{table_ref}`
+                         WHERE table_name = @table_name),
+                        TIMESTAMP('1970-01-01 00:00:00')
+                    ) AS last_sync_time,
+                    @status AS status,
+                    @row_count AS row_count,
+                    @column_count AS column_count,
+                    @remark AS remark
             ) S
             ON M.table_name = S.table_name
             WHEN MATCHED THEN
-              UPDATE SET 
+              UPDATE SET
                 last_run_time = S.last_run_time,
                 last_sync_time = S.last_sync_time,
                 status = S.status,
@@ -184,24 +215,130 @@ class MetadataManager:
                 column_count = S.column_count,
                 remark = S.remark
             WHEN NOT MATCHED THEN
-              INSERT (table_name, last_run_time, last_sync_time, status, 
+              INSERT (table_name, last_run_time, last_sync_time, status,
                       row_count, column_count, remark)
-              VALUES (S.table_name, S.last_run_time, S.last_sync_time, 
+              VALUES (S.table_name, S.last_run_time, S.last_sync_time,
                       S.status, S.row_count, S.column_count, S.remark)
             """
-            
+
+            job_config = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter('table_name', 'STRING', table_name),
+                bigquery.ScalarQueryParameter('run_time', 'TIMESTAMP', run_time),
+                bigquery.ScalarQueryParameter('sync_time', 'TIMESTAMP', sync_time),
+                bigquery.ScalarQueryParameter('status', 'STRING', status),
+                bigquery.ScalarQueryParameter('row_count', 'INT64', row_count),
+                bigquery.ScalarQueryParameter('column_count', 'INT64', column_count),
+                bigquery.ScalarQueryParameter('remark', 'STRING', remark)
+            ])
+
             # Debug: Show the sync_time being stored
-            if sync_time and status == 'SUCCESS':
-                print(f"[Metadata] Storing sync_time for {table_name}: {sync_time_str}")
+            if sync_time:
+                print(f"[Metadata] Storing sync_time for {table_name}: {sync_time}")
             else:
                 print(f"[Metadata] NOT updating sync_time for {table_name} (status={status}, sync_time={sync_time})")
-            
-            self.client.query(merge_sql).result()
-            
+
+            self.client.query(merge_sql, job_config=job_config).result()
+
             # Debug: Log what was stored
             print(f"[Metadata] Updated {table_name}: status={status}")
-            
+
             return None
-            
+
         except Exception as e:
-            return f"Failed to update metadata: {str(e)}"
\ No newline at end of file
+            return f"Failed to update metadata: {str(e)}"
+
+    def bulk_update_metadata(
+        self,
+        project_id: str,
+        dataset_id: str,
+        metadata_table_id: str,
+        updates: List[Dict]
+    ) -> Optional[str]:
+        """
+        Update metadata for several tables with a single MERGE.
+
+        One query job per table adds up to roughly a second of launch
+        latency each; sending all rows through UNNEST(@rows) issues one
+        job regardless of table count.
+
+        Args:
+            project_id: BigQuery project ID
+            dataset_id: BigQuery dataset ID
+            metadata_table_id: Metadata table ID
+            updates: List of dicts with keys table_name, run_time,
+                sync_time (None keeps the stored value), status,
+                row_count, column_count, remark
+
+        Returns:
+            Error message if failed, None if successful
+        """
+        if not updates:
+            return None
+
+        try:
+            table_ref = f"{project_id}.{dataset_id}.{metadata_table_id}"
+
+            merge_sql = f"""
+            MERGE `{table_ref}` M
+            USING (SELECT * FROM UNNEST(@rows)) S
+            ON M.table_name = S.table_name
+            WHEN MATCHED THEN
+              UPDATE SET
+                last_run_time = S.last_run_time,
+                last_sync_time = COALESCE(S.last_sync_time, M.last_sync_time),
+                status = S.status,
+                row_count = S.row_count,
+                column_count = S.column_count,
+                remark = S.remark
+            WHEN NOT MATCHED THEN
+              INSERT (table_name, last_run_time, last_sync_time, status,
+                      row_count, column_count, remark)
+              VALUES (S.table_name, S.last_run_time,
+                      COALESCE(S.last_sync_time, TIMESTAMP('1970-01-01 00:00:00')),
+                      S.status, S.row_count, S.column_count, S.remark)
+            """
+
+            row_params = []
+            for update in updates:
+                run_time = update['run_time'].astimezone(self.TIMEZONE).replace(tzinfo=None)
+                sync_time = update.get('sync_time')
+                if sync_time is not None:
+                    sync_time = self._normalize_sync_time(sync_time)
+
+                row_params.append(bigquery.StructQueryParameter(
+                    None,
+                    bigquery.ScalarQueryParameter('table_name', 'STRING', update['table_name']),
+                    bigquery.ScalarQueryParameter('last_run_time', 'TIMESTAMP', run_time),
+                    bigquery.ScalarQueryParameter('last_sync_time', 'TIMESTAMP', sync_time),
+                    bigquery.ScalarQueryParameter('status', 'STRING', update['status']),
+                    bigquery.ScalarQueryParameter('row_count', 'INT64', update['row_count']),
+                    bigquery.ScalarQueryParameter('column_count', 'INT64', update['column_count']),
+                    bigquery.ScalarQueryParameter('remark', 'STRING', update['remark'])
+                ))
+
+            job_config = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ArrayQueryParameter('rows', 'STRUCT', row_params)
+            ])
+
+            self.client.query(merge_sql, job_config=job_config).result()
+
+            print(f"[Metadata] Updated {len(updates)} table(s) in one MERGE")
+
+            return None
+
+        except Exception as e:
+            return f"Failed to bulk update metadata: {str(e)}"
+
+    def _normalize_sync_time(self, sync_time: datetime) -> datetime:
+        """Coerce pandas Timestamps and tz-aware values to naive Lagos time."""
+        # Handle both datetime and Timestamp objects from pandas
+        if hasattr(sync_time, 'to_pydatetime'):
+            sync_time = sync_time.to_pydatetime()
+
+        # If timezone-aware, convert to Lagos time then remove tz. The
+        # hasattr guard matters: a DATE incremental column yields a plain
+        # date watermark, which has no tzinfo
+        if hasattr(sync_time, 'tzinfo') and sync_time.tzinfo is not None:
+            sync_time = sync_time.astimezone(self.TIMEZONE).replace(tzinfo=None)
+
+        return sync_time
\ No newline at end of file
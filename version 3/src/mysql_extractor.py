@@ -1,97 +1,187 @@
 """
 MySQL data extraction module with SSH tunnel support.
 """
+import queue
 import pandas as pd
+import pyarrow as pa
 import pymysql
+from contextlib import contextmanager
 from sshtunnel import SSHTunnelForwarder
 from datetime import datetime
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 
 
 class MySQLExtractor:
-    """Handles MySQL data extraction via SSH tunnel."""
-    
+    """
+    Handles MySQL data extraction via SSH tunnel.
+
+    Use as a context manager to keep one SSH tunnel and a small pool of
+    connections alive for the whole pipeline; the tunnel handshake alone
+    costs a few seconds, and per-call setup pays it twice per table.
+    Outside a with-block each call still opens its own tunnel.
+    """
+
+    # Rows pulled from the server-side cursor per fetchmany call
+    FETCH_CHUNK_ROWS = 50000
+
+    # Connections kept open while used as a context manager; sized to
+    # match the orchestrator's worker thread cap
+    POOL_SIZE = 8
+
     def __init__(self, mysql_config: Dict[str, Any]):
         self.config = mysql_config
-    
+        self._tunnel = None
+        self._pool = None
+
+    def __enter__(self):
+        self._tunnel = SSHTunnelForwarder(
+            (self.config['ssh_host'], self.config['ssh_port']),
+            ssh_username=self.config['ssh_user'],
+            ssh_pkey=self.config['ssh_private_key'],
+            remote_bind_address=('127.0.0.1', self.config['db_port'])
+        )
+        self._tunnel.start()
+
+        self._pool = queue.Queue()
+        for _ in range(self.POOL_SIZE):
+            self._pool.put(self._connect(self._tunnel.local_bind_port))
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        while not self._pool.empty():
+            try:
+                self._pool.get_nowait().close()
+            except Exception:
+                pass
+        self._pool = None
+
+        self._tunnel.stop()
+        self._tunnel = None
+        return False
+
+    def _connect(self, local_port: int) -> pymysql.connections.Connection:
+        """Open a connection through the tunnel's local port."""
+        return pymysql.connect(
+            host='127.0.0.1',
+            port=local_port,
+            user=self.config['db_user'],
+            password=self.config['db_password'],
+            database=self.config['db_name'],
+            # Server-side cursor: rows stream from MySQL instead of
+            # being buffered in full on the client
+            cursorclass=pymysql.cursors.SSCursor
+        )
+
+    @contextmanager
+    def _borrow_connection(self):
+        """
+        Yield a connection: from the pool when inside a with-block,
+        otherwise over a transient per-call tunnel.
+        """
+        if self._pool is not None:
+            connection = self._pool.get()
+            try:
+                # A previous borrower may have left the connection broken;
+                # reconnect in place so one failure doesn't poison the pool
+                connection.ping(reconnect=True)
+                yield connection
+            finally:
+                self._pool.put(connection)
+        else:
+            with SSHTunnelForwarder(
+                (self.config['ssh_host'], self.config['ssh_port']),
+                ssh_username=self.config['ssh_user'],
+                ssh_pkey=self.config['ssh_private_key'],
+                remote_bind_address=('127.0.0.1', self.config['db_port'])
+            ) as tunnel:
+                connection = self._connect(tunnel.local_bind_port)
+                try:
+                    yield connection
+                finally:
+                    connection.close()
+
     def extract_incremental_data(
-        self, 
-        table_name: str, 
+        self,
+        table_name: str,
         incremental_column: str,
-        last_synced: datetime
-    ) -> Tuple[pd.DataFrame, Optional[str]]:
+        last_synced: datetime,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[pd.DataFrame, Optional[pa.Table], Optional[str]]:
         """
         Extract incremental data from MySQL table.
-        
+
         Args:
             table_name: Name of the MySQL table
             incremental_column: Column to use for incremental sync
             last_synced: Timestamp of last successful sync
-            
+            columns: Columns to select; pass the target-table columns so
+                MySQL-only columns (often TEXT/BLOB) never cross the SSH
+                tunnel. Defaults to SELECT *.
+
         Returns:
-            Tuple of (DataFrame, error_message)
+            Tuple of (DataFrame, arrow_table, error_message). The Arrow
+            table backs the DataFrame and lets callers run columnar
+            reductions (e.g. max) without pandas object-dtype overhead;
+            it is None when no rows came back.
         """
         try:
-            with SSHTunnelForwarder(
-                (self.config['ssh_host'], self.config['ssh_port']),
-                ssh_username=self.config['ssh_user'],
-                ssh_pkey=self.config['ssh_private_key'],
-                remote_bind_address=('127.0.0.1', self.config['db_port'])
-            ) as tunnel:
-                connection = pymysql.connect(
-                    host='127.0.0.1',
-                    port=tunnel.local_bind_port,
-                    user=self.config['db_user'],
-                    password=self.config['db_password'],
-                    database=self.config['db_name'],
-                    cursorclass=pymysql.cursors.DictCursor
-                )
-                
+            with self._borrow_connection() as connection:
                 with connection.cursor() as cursor:
-                    query = f"SELECT * FROM {table_name} WHERE {incremental_column} > %s"
+                    if columns:
+                        cols_sql = ", ".join(f"`{c}`" for c in columns)
+                    else:
+                        cols_sql = "*"
+                    query = (
+                        f"SELECT {cols_sql} FROM `{table_name}` "
+                        f"WHERE `{incremental_column}` > %s"
+                    )
                     cursor.execute(query, (last_synced,))
-                    result = cursor.fetchall()
-                    df = pd.DataFrame(result)
-                
-                connection.close()
-            
-            return df, None
-            
+                    columns = [desc[0] for desc in cursor.description]
+
+                    # Consume in fixed-size chunks, converting each straight
+                    # to columnar Arrow storage so memory stays bounded and
+                    # we never hold per-row dicts for the whole result
+                    chunks = []
+                    while True:
+                        rows = cursor.fetchmany(self.FETCH_CHUNK_ROWS)
+                        if not rows:
+                            break
+                        chunk_cols = {
+                            col: [row[i] for row in rows]
+                            for i, col in enumerate(columns)
+                        }
+                        chunks.append(pa.Table.from_pydict(chunk_cols))
+
+                if not chunks:
+                    return pd.DataFrame(columns=columns), None, None
+
+                arrow_table = pa.concat_tables(chunks, promote_options="default")
+                df = arrow_table.to_pandas()
+
+            return df, arrow_table, None
+
         except Exception as e:
-            return pd.DataFrame(), f"MySQL extraction failed: {str(e)}"
-    
+            return pd.DataFrame(), None, f"MySQL extraction failed: {str(e)}"
+
     def get_table_schema(self, table_name: str) -> Tuple[Optional[Dict], Optional[str]]:
         """
         Fetch MySQL table schema information.
-        
+
         Args:
             table_name: Name of the MySQL table
-            
+
         Returns:
             Tuple of (schema_dict, error_message)
             schema_dict format: {column_name: {'type': mysql_type, 'nullable': bool}}
         """
         try:
-            with SSHTunnelForwarder(
-                (self.config['ssh_host'], self.config['ssh_port']),
-                ssh_username=self.config['ssh_user'],
-                ssh_pkey=self.config['ssh_private_key'],
-                remote_bind_address=('127.0.0.1', self.config['db_port'])
-            ) as tunnel:
-                connection = pymysql.connect(
-                    host='127.0.0.1',
-                    port=tunnel.local_bind_port,
-                    user=self.config['db_user'],
-                    password=self.config['db_password'],
-                    database=self.config['db_name'],
-                    cursorclass=pymysql.cursors.DictCursor
-                )
-                
-                with connection.cursor() as cursor:
+            with self._borrow_connection() as connection:
+                with connection.cursor(pymysql.cursors.DictCursor) as cursor:
                     query = f"DESCRIBE {table_name}"
                     cursor.execute(query)
                     columns = cursor.fetchall()
-                    
+
                     schema = {}
                     for col in columns:
                         schema[col['Field']] = {
@@ -100,10 +190,8 @@ class MySQLExtractor:
                             'key': col['Key'],
                             'default': col['Default']
                         }
-                
-                connection.close()
-            
+
             return schema, None
-            
+
         except Exception as e:
             return None, f"Failed to fetch MySQL schema: {str(e)}"
@@ -9,6 +9,84 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 
+# Email template parts are module-level constants so the markup is parsed
+# once at import; rows are rendered per result and joined in one pass
+EMAIL_HEADER = """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; }}
+                h2 {{ color: #333; }}
+                .summary {{
+                    padding: 15px;
+                    background-color: #f0f0f0;
+                    border-radius: 5px;
+                    margin-bottom: 20px;
+                }}
+                .success {{ color: #28a745; font-weight: bold; }}
+                .failed {{ color: #dc3545; font-weight: bold; }}
+                table {{
+                    border-collapse: collapse;
+                    width: 100%;
+                }}
+                th {{
+                    background-color: #4CAF50;
+                    color: white;
+                    padding: 12px;
+                    text-align: left;
+                }}
+                td {{
+                    border: 1px solid #ddd;
+                    padding: 10px;
+                }}
+                tr:nth-child(even) {{ background-color: #f9f9f9; }}
+                .status-success {{ color: #28a745; font-weight: bold; }}
+                .status-failed {{ color: #dc3545; font-weight: bold; }}
+            </style>
+        </head>
+        <body>
+            <h2>MySQL → BigQuery Sync Pipeline Report</h2>
+            <div class="summary">
+                <p><strong>Sync Completed:</strong> {completed_time}</p>
+                <p><span class="success">✓ Successful: {success_count}</span> |
+                   <span class="failed">✗ Failed: {failed_count}</span></p>
+            </div>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>Table</th>
+                        <th>Status</th>
+                        <th>Rows Synced</th>
+                        <th>Columns</th>
+                        <th>New Columns</th>
+                        <th>Sync Time</th>
+                        <th>Remarks</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+
+EMAIL_ROW_TMPL = """
+                <tr>
+                    <td>{table}</td>
+                    <td class="{status_class}">{status}</td>
+                    <td>{row_count}</td>
+                    <td>{column_count}</td>
+                    <td>{new_cols}</td>
+                    <td>{sync_time}</td>
+                    <td>{remark}</td>
+                </tr>
+            """
+
+EMAIL_FOOTER = """
+                </tbody>
+            </table>
+        </body>
+        </html>
+        """
+
+
 class Notifier:
     """Handles sending notifications via email and telegram."""
     
@@ -53,6 +131,10 @@ class Notifier:
         if not sync_results or not recipients:
             return None
         
+        # Capture the report timestamp once; one clock read and one
+        # strftime for the whole message
+        completed_str = self.get_current_time().strftime('%Y-%m-%d %H:%M:%S WAT')
+
         # Count successes and failures
         success_count = sum(1 for r in sync_results if r.get('status') == 'SUCCESS')
         failed_count = len(sync_results) - success_count
@@ -63,63 +145,9 @@ class Notifier:
         msg['From'] = self.sender_email or "SENDEREMAIL"
         msg['To'] = ", ".join(recipients)
         
-        # Build HTML content
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; }}
-                h2 {{ color: #333; }}
-                .summary {{ 
-                    padding: 15px; 
-                    background-color: #f0f0f0; 
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                }}
-                .success {{ color: #28a745; font-weight: bold; }}
-                .failed {{ color: #dc3545; font-weight: bold; }}
-                table {{ 
-                    border-collapse: collapse; 
-                    width: 100%;
-                }}
-                th {{ 
-                    background-color: #4CAF50; 
-                    color: white;
-                    padding: 12px;
-                    text-align: left;
-                }}
-                td {{ 
-                    border: 1px solid #ddd;
-                    padding: 10px;
-                }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                .status-success {{ color: #28a745; font-weight: bold; }}
-                .status-failed {{ color: #dc3545; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <h2>MySQL → BigQuery Sync Pipeline Report</h2>
-            <div class="summary">
-                <p><strong>Sync Completed:</strong> {self.get_current_time().strftime('%Y-%m-%d %H:%M:%S WAT')}</p>
-                <p><span class="success">✓ Successful: {success_count}</span> | 
-                   <span class="failed">✗ Failed: {failed_count}</span></p>
-            </div>
-            
-            <table>
-                <thead>
-                    <tr>
-                        <th>Table</th>
-                        <th>Status</th>
-                        <th>Rows Synced</th>
-                        <th>Columns</th>
-                        <th>New Columns</th>
-                        <th>Sync Time</th>
-                        <th>Remarks</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        
+        # Render each row, then assemble the message in one join instead
+        # of growing one string per iteration
+        rows = []
         for result in sync_results:
             status_class = "status-success" if result.get('status') == 'SUCCESS' else "status-failed"
             new_cols = ", ".join(result.get('new_columns', [])) or "-"
@@ -132,25 +160,23 @@ class Notifier:
             else:
                 sync_time_str = '-'
             
-            html_content += f"""
-                <tr>
-                    <td>{result.get('table', 'N/A')}</td>
-                    <td class="{status_class}">{result.get('status', 'UNKNOWN')}</td>
-                    <td>{result.get('row_count', 0)}</td>
-                    <td>{result.get('column_count', 0)}</td>
-                    <td>{new_cols}</td>
-                    <td>{sync_time_str}</td>
-                    <td>{result.get('remark', '')}</td>
-                </tr>
-            """
-        
-        html_content += """
-                </tbody>
-            </table>
-        </body>
-        </html>
-        """
-        
+            rows.append(EMAIL_ROW_TMPL.format(
+                table=result.get('table', 'N/A'),
+                status_class=status_class,
+                status=result.get('status', 'UNKNOWN'),
+                row_count=result.get('row_count', 0),
+                column_count=result.get('column_count', 0),
+                new_cols=new_cols,
+                sync_time=sync_time_str,
+                remark=result.get('remark', '')
+            ))
+
+        html_content = EMAIL_HEADER.format(
+            completed_time=completed_str,
+            success_count=success_count,
+            failed_count=failed_count
+        ) + "".join(rows) + EMAIL_FOOTER
+
         msg.attach(MIMEText(html_content, "html"))
         
         # Send email
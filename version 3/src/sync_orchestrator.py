@@ -2,10 +2,12 @@
 Main orchestrator for MySQL to BigQuery sync pipeline.
 """
 import pandas as pd
+import pyarrow.compute as pc
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from google.cloud import bigquery
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 from config_loader import ConfigLoader
 from mysql_extractor import MySQLExtractor
@@ -54,15 +56,19 @@ class SyncOrchestrator:
         return datetime.now(self.TIMEZONE)
     
     def sync_table(
-        self, 
-        table_config: Dict[str, Any]
+        self,
+        table_config: Dict[str, Any],
+        last_synced: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Sync a single table from MySQL to BigQuery.
-        
+
         Args:
             table_config: Configuration dictionary for the table
-            
+            last_synced: Last successful sync time, as preloaded by
+                load_all_last_sync_times; falls back to a per-table
+                metadata query when not provided
+
         Returns:
             Dictionary with sync results
         """
@@ -113,28 +119,46 @@ class SyncOrchestrator:
                     return result
                 result['remark'] += "Table created from MySQL schema. "
             
-            # Add missing columns to existing table
-            new_cols, err = self.schema_manager.add_missing_columns(
-                target_ref, mysql_schema
-            )
-            if err:
-                result['remark'] += f"Column addition warning: {err}. "
-            elif new_cols:
-                result['new_columns'] = new_cols
-                result['remark'] += f"Added columns: {', '.join(new_cols)}. "
-            
-            # Get last sync time (from staging dataset metadata)
-            last_synced = self.metadata_manager.get_last_sync_time(
-                project_id, staging_dataset_id, 
-                bq_config['metadata_table_id'], 
-                bq_table_id
-            )
+            # Add missing columns to existing table. A local set diff
+            # against the cached target schema decides whether the call is
+            # needed at all; in steady state (no new MySQL columns) this
+            # skips a get_table RPC and the ALTER path entirely.
+            target_col_names = {
+                f.name for f in self.bq_handler.get_table_cached(target_ref).schema
+            }
+            if any(c not in target_col_names for c in mysql_schema):
+                new_cols, err = self.schema_manager.add_missing_columns(
+                    target_ref, mysql_schema
+                )
+                if err:
+                    result['remark'] += f"Column addition warning: {err}. "
+                elif new_cols:
+                    result['new_columns'] = new_cols
+                    result['remark'] += f"Added columns: {', '.join(new_cols)}. "
+                    # Schema changed; don't serve the stale cached table
+                    self.bq_handler.invalidate_table_cache(target_ref)
             
+            # Get last sync time (from staging dataset metadata) unless the
+            # pipeline already loaded it for all tables in one query
+            if last_synced is None:
+                last_synced = self.metadata_manager.get_last_sync_time(
+                    project_id, staging_dataset_id,
+                    bq_config['metadata_table_id'],
+                    bq_table_id
+                )
+
             print(f"[{mysql_table}] Last synced timestamp: {last_synced}")
             
+            # Project only columns the target table has; MySQL-only columns
+            # would be dropped anyway and just waste tunnel bandwidth
+            target_cols = [
+                f.name for f in self.bq_handler.get_table_cached(target_ref).schema
+                if f.name in mysql_schema
+            ]
+
             # Extract data from MySQL
-            df, err = self.mysql_extractor.extract_incremental_data(
-                mysql_table, incremental_col, last_synced
+            df, arrow_tbl, err = self.mysql_extractor.extract_incremental_data(
+                mysql_table, incremental_col, last_synced, target_cols
             )
             if err:
                 result['remark'] += f"MySQL extraction failed: {err}"
@@ -145,45 +169,74 @@ class SyncOrchestrator:
             # Prepare DataFrame using MySQL schema as source of truth
             df = self.schema_manager.prepare_dataframe_with_schema(df, mysql_schema)
             
-            # Ensure staging table exists (in staging dataset)
-            staging_ref = f"{project_id}.{staging_dataset_id}.{bq_table_id}_staging"
-            schema, err = self.bq_handler.ensure_staging_table(target_ref, staging_ref)
-            if err:
-                result['remark'] += f"Staging table error: {err}"
-                return result
-            
-            # Update staging table schema if needed
-            staging_new_cols, err = self.schema_manager.add_missing_columns(
-                staging_ref, mysql_schema
-            )
-            if err:
-                result['remark'] += f"Staging schema update warning: {err}. "
-            
-            # Load to staging
-            row_count, err = self.bq_handler.load_to_staging(df, staging_ref, schema)
-            if err:
-                result['remark'] += f"Load to staging failed: {err}"
-                return result
-            
-            result['row_count'] = row_count
-            
-            # Merge to target (staging dataset to production dataset)
-            merge_msg, err = self.bq_handler.merge_staging_to_target(
-                project_id, dataset_id, staging_dataset_id,
-                bq_table_id, f"{bq_table_id}_staging", 
-                primary_key, incremental_col, df
-            )
-            
-            if err:
-                result['remark'] += f"Merge failed: {err}"
-                return result
-            
+            lookback_days = table_config.get('merge_lookback_days')
+
+            if len(df) < self.bq_handler.INLINE_MERGE_MAX_ROWS:
+                # Small (or empty) batch: send the rows inline with the
+                # MERGE and skip the staging table and load job entirely
+                merge_msg, err = self.bq_handler.merge_inline(
+                    project_id, dataset_id, bq_table_id,
+                    primary_key, incremental_col, df,
+                    lookback_days=lookback_days
+                )
+                if err:
+                    result['remark'] += f"Merge failed: {err}"
+                    return result
+
+                result['row_count'] = len(df)
+            else:
+                # Create a per-run staging table (in staging dataset). It is
+                # created from the target schema after column additions, so no
+                # separate staging schema update is needed.
+                staging_ref, schema, err = self.bq_handler.create_staging_table(
+                    target_ref, staging_dataset_id
+                )
+                if err:
+                    result['remark'] += f"Staging table error: {err}"
+                    return result
+
+                # Load to staging
+                row_count, err = self.bq_handler.load_to_staging(
+                    df, staging_ref, schema,
+                    use_storage_write=bq_config.get('use_storage_write_api', False)
+                )
+                if err:
+                    result['remark'] += f"Load to staging failed: {err}"
+                    return result
+
+                result['row_count'] = row_count
+
+                # Merge to target (staging dataset to production dataset).
+                # Submitted without waiting: BigQuery runs the job while
+                # other tables extract and load, and run_sync_pipeline
+                # finalizes all merges together.
+                merge_job, err = self.bq_handler.merge_staging_to_target(
+                    project_id, dataset_id, staging_dataset_id,
+                    bq_table_id, staging_ref.split('.')[-1],
+                    primary_key, incremental_col, df,
+                    lookback_days=lookback_days,
+                    wait=False
+                )
+
+                if err:
+                    result['remark'] += f"Merge failed: {err}"
+                    return result
+
+                result['pending_merge'] = (merge_job, staging_ref)
+                merge_msg = "Merge submitted"
+
             result['remark'] += merge_msg
             result['status'] = 'SUCCESS'
             result['sync_time'] = self.get_current_time()
             
-            # Get the actual last synced timestamp from the data
-            if not df.empty and incremental_col in df.columns:
+            # Get the actual last synced timestamp from the data. The Arrow
+            # max is a C kernel; pandas max on an object-dtype column falls
+            # back to a Python-level loop.
+            if arrow_tbl is not None and incremental_col in arrow_tbl.column_names:
+                last_synced_value = pc.max(arrow_tbl[incremental_col]).as_py()
+                print(f"[{mysql_table}] New last_synced_value: {last_synced_value}")
+                result['last_synced_value'] = last_synced_value
+            elif not df.empty and incremental_col in df.columns:
                 last_synced_value = df[incremental_col].max()
                 print(f"[{mysql_table}] New last_synced_value: {last_synced_value}")
                 result['last_synced_value'] = last_synced_value
@@ -211,13 +264,65 @@ class SyncOrchestrator:
             bq_config['metadata_table_id']
         )
         
+        # One query for every table's last sync time instead of one per table
+        last_sync_times = self.metadata_manager.load_all_last_sync_times(
+            bq_config['project_id'],
+            bq_config['staging_dataset_id'],
+            bq_config['metadata_table_id']
+        )
+
         sync_results = []
-        
-        # Sync each table
+
+        # Sync tables in parallel: every step is network-bound (MySQL
+        # extraction, BigQuery load and MERGE), so overlapping tables in a
+        # thread pool collapses the per-table waits. The shared BigQuery
+        # client is thread-safe; workers share one SSH tunnel through the
+        # extractor's connection pool.
+        max_workers = min(8, max(len(self.config.tables), 1))
+        with self.mysql_extractor, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_table = {
+                executor.submit(
+                    self.sync_table,
+                    table_config,
+                    last_sync_times.get(
+                        table_config['bq_table'], datetime(1970, 1, 1)
+                    )
+                ): table_config
+                for table_config in self.config.tables
+            }
+            results_by_table = {}
+            for future in as_completed(future_to_table):
+                table_config = future_to_table[future]
+                results_by_table[table_config['bq_table']] = future.result()
+
+        # Settle the asynchronously submitted merges; their jobs have been
+        # running server-side while the remaining tables extracted/loaded
+        for result in results_by_table.values():
+            pending = result.pop('pending_merge', None)
+            if pending is None:
+                continue
+            merge_job, staging_ref = pending
+            merge_msg, merge_err = self.bq_handler.finalize_merge(merge_job, staging_ref)
+            if merge_err:
+                result['status'] = 'FAILED'
+                result['sync_time'] = None
+                result['last_synced_value'] = None
+                result['remark'] = result['remark'].replace(
+                    "Merge submitted", merge_err
+                )
+            else:
+                result['remark'] = result['remark'].replace(
+                    "Merge submitted", merge_msg
+                )
+
+        # Record results in config order and collect metadata rows for one
+        # bulk MERGE instead of a query job per table
+        metadata_updates = []
         for table_config in self.config.tables:
-            result = self.sync_table(table_config)
+            result = results_by_table[table_config['bq_table']]
             sync_results.append(result)
-            
+
             # Determine the sync time value to store
             if result['status'] == 'SUCCESS' and result.get('last_synced_value') is not None:
                 sync_time_to_store = result['last_synced_value']
@@ -225,21 +330,28 @@ class SyncOrchestrator:
             else:
                 sync_time_to_store = None
                 print(f"[{table_config['bq_table']}] No last_synced_value to store (status={result['status']}, value={result.get('last_synced_value')})")
-            
-            # Update metadata (in staging dataset)
-            self.metadata_manager.update_metadata(
-                bq_config['project_id'],
-                bq_config['staging_dataset_id'],  # Use staging dataset for metadata
-                bq_config['metadata_table_id'],
-                table_config['bq_table'],
-                result['run_time'],
-                sync_time_to_store,  # Use the actual last synced timestamp
-                result['status'],
-                result['row_count'],
-                result['column_count'],
-                result['remark']
-            )
-        
+
+            metadata_updates.append({
+                'table_name': table_config['bq_table'],
+                'run_time': result['run_time'],
+                'sync_time': sync_time_to_store,  # Use the actual last synced timestamp
+                'status': result['status'],
+                'row_count': result['row_count'],
+                'column_count': result['column_count'],
+                'remark': result['remark']
+            })
+
+        # Update metadata (in staging dataset)
+        metadata_err = self.metadata_manager.bulk_update_metadata(
+            bq_config['project_id'],
+            bq_config['staging_dataset_id'],  # Use staging dataset for metadata
+            bq_config['metadata_table_id'],
+            metadata_updates
+        )
+        if metadata_err:
+            print(f"Metadata update failed: {metadata_err}")
+
+
         # Send notifications
         if self.config.alert_recipients:
             email_err = self.notifier.send_email_alert(